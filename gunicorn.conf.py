@@ -0,0 +1,10 @@
+# gunicorn.conf.py
+"""
+Gunicorn hooks (picked up automatically from the working directory).
+"""
+
+
+def post_worker_init(worker):
+    # Per-worker (post-fork) so each worker warms its own upstream pool
+    from server import prewarm_upstream
+    prewarm_upstream()
@@ -1,24 +1,26 @@
 # server.py
 """
-Flask + Gunicorn HTTP MCP server with FastMCP-style tools (no stdio).
-- Works on Render (Procfile uses gunicorn).
+Flask + Gunicorn HTTP MCP server with FastMCP-style tools.
+- Works on Render (Procfile uses gunicorn with threaded workers).
 - Exposes HTTP endpoints the Platform Builder probes.
+- FastMCP (stdio) is only imported when run directly with MCP_STDIO=1.
 """
 
 import os
-import json
-from typing import Optional, Dict, Any
+import re
+import hmac
+import atexit
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, Callable, Dict, Any
 from uuid import uuid4
-from flask import Flask, request, jsonify, make_response
+from flask import Flask, Response, request
 import httpx
-from openai import OpenAI
-
-# Optional: FastMCP for decorator style (we won't run mcp.run_stdio())
-try:
-    from mcp.server.fastmcp import FastMCP
-    _FASTMCP_AVAILABLE = True
-except Exception:
-    _FASTMCP_AVAILABLE = False
+import orjson
+from cachetools import TTLCache
+from sora_core import start_job, get_job
 
 app = Flask(__name__)
 
@@ -30,22 +32,116 @@ SORA_API_KEY  = os.getenv("SORA_API_KEY") or os.getenv("OPENAI_API_KEY")
 SORA_MODEL_ID = os.getenv("SORA_MODEL_ID", "sora-2")
 ACCESS_TOKEN  = os.getenv("MCP_ACCESS_TOKEN")  # optional bearer
 HTTP_TIMEOUT  = float(os.getenv("HTTP_TIMEOUT", "60"))
+POLL_WORKERS  = int(os.getenv("MCP_POLL_WORKERS", "16"))  # fan-out for batched polls
+POLL_BATCH_MAX = int(os.getenv("MCP_POLL_BATCH_MAX", "50"))  # job_ids per batched call
+POLL_CACHE_TTL = float(os.getenv("MCP_POLL_CACHE_TTL", "1"))  # seconds; 0 disables
+LOG_LEVEL     = os.getenv("LOG_LEVEL", "WARNING").upper()
+if not isinstance(logging.getLevelName(LOG_LEVEL), int):
+    LOG_LEVEL = "WARNING"  # unknown name (e.g. "verbose"); don't fail the import over it
+MCP_STDIO     = os.getenv("MCP_STDIO") == "1"  # serve FastMCP over stdio instead of HTTP
+PREWARM       = os.getenv("MCP_PREWARM", "1") != "0"  # open the upstream connection at boot
+
+logger = logging.getLogger("mcp")
+logger.setLevel(LOG_LEVEL)
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("[MCP] %(message)s"))
+    logger.addHandler(_handler)
+    logger.propagate = False
+
+
+# -----------------------------
+# Shared upstream client (HTTP/2 keep-alive pool, reused across tool calls)
+# -----------------------------
+_HTTP: Optional[httpx.Client] = None
+_HTTP_LOCK = threading.Lock()
+
+def _http() -> httpx.Client:
+    # Lazy so that with `gunicorn --preload` each forked worker opens its own pool
+    global _HTTP
+    if _HTTP is None:
+        with _HTTP_LOCK:
+            if _HTTP is None:
+                _HTTP = httpx.Client(
+                    base_url=SORA_API_BASE,
+                    headers={"Authorization": f"Bearer {SORA_API_KEY}"} if SORA_API_KEY else None,
+                    timeout=HTTP_TIMEOUT,
+                    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                    http2=True,  # multiplex concurrent polls over one TLS connection (needs h2)
+                )
+                atexit.register(_HTTP.close)
+    return _HTTP
+
+def prewarm_upstream() -> None:
+    # Resolve DNS + finish the TLS/HTTP2 handshake before the first tool call.
+    # Called post-fork per worker (gunicorn.conf.py) and by the dev entry below.
+    if not PREWARM:
+        return
+
+    def _warm() -> None:
+        try:
+            r = _http().get("/models", timeout=5)
+            if r.http_version != "HTTP/2":
+                # Visible at the default level: h2 missing or ALPN fell back to HTTP/1.1
+                logger.warning("upstream negotiated %s, not HTTP/2", r.http_version)
+            else:
+                logger.info("upstream pool warmed (%s %s)", r.http_version, r.status_code)
+        except Exception as e:
+            logger.warning("upstream prewarm failed: %s", e)
+
+    threading.Thread(target=_warm, name="sora-prewarm", daemon=True).start()
+
+# Batched get_sora_job calls overlap their upstream waits on these threads
+_POLL_POOL = ThreadPoolExecutor(max_workers=POLL_WORKERS, thread_name_prefix="sora-poll")
+
+# Poll cache: in-progress jobs are reused for POLL_CACHE_TTL, terminal ones for good
+_TERMINAL_STATUSES = frozenset({"completed", "failed", "canceled", "cancelled"})
+_POLL_CACHE = TTLCache(maxsize=4096, ttl=POLL_CACHE_TTL) if POLL_CACHE_TTL > 0 else None
+_TERMINAL: Dict[str, Dict[str, Any]] = {}
+_INFLIGHT: Dict[str, Future] = {}  # job_id -> upstream poll shared by concurrent callers
+_POLL_LOCK = threading.Lock()
 
 
 # -----------------------------
 # Helpers
 # -----------------------------
 def _ok(data: Any, code: int = 200):
-    return make_response(jsonify(data), code)
+    return Response(orjson.dumps(data), status=code, mimetype="application/json")
 
 def _err(msg: str, code: int = 400):
     return _ok({"ok": False, "error": msg}, code)
 
-def _safe_json(resp: httpx.Response) -> Any:
+def _poll_job(job_id: str) -> Dict[str, Any]:
+    with _POLL_LOCK:
+        cached = _TERMINAL.get(job_id)
+        if cached is None and _POLL_CACHE is not None:
+            cached = _POLL_CACHE.get(job_id)
+        if cached is None:
+            inflight = _INFLIGHT.get(job_id)
+            if inflight is None:
+                _INFLIGHT[job_id] = pending = Future()
+    if cached is not None:
+        return cached
+    if inflight is not None:
+        # Same job already being polled upstream: wait for that response
+        return inflight.result()
+
     try:
-        return resp.json()
-    except json.JSONDecodeError:
-        return {"status_code": resp.status_code, "text": resp.text}
+        summary, ok = get_job(_http(), job_id)
+    except BaseException as e:
+        with _POLL_LOCK:
+            del _INFLIGHT[job_id]
+        pending.set_exception(e)
+        raise
+    with _POLL_LOCK:
+        del _INFLIGHT[job_id]
+        if ok:
+            if summary["status"] in _TERMINAL_STATUSES:
+                _TERMINAL[job_id] = summary
+            elif _POLL_CACHE is not None:
+                _POLL_CACHE[job_id] = summary
+    pending.set_result(summary)
+    return summary
 
 def _start_job_schema() -> Dict[str, Any]:
     return {
@@ -69,8 +165,8 @@ def _get_job_schema() -> Dict[str, Any]:
     }
 
 def _tool_list_payload() -> Dict[str, Any]:
-    start_schema = _start_job_schema()
-    get_schema   = _get_job_schema()
+    start_schema = _START_JOB_SCHEMA
+    get_schema   = _GET_JOB_SCHEMA
     return {
         "tools": [
             {
@@ -92,112 +188,75 @@ def _tool_list_payload() -> Dict[str, Any]:
         ]
     }
 
+def _schema_payload() -> Dict[str, Any]:
+    return {
+        "name": "sora-mcp",
+        "version": "1.0.0",
+        "endpoints": {"tools": "/tools", "run": "/tools/call"},
+        "tools": [t["name"] for t in _tool_list_payload()["tools"]],
+    }
+
+def _rpc_tools_result() -> Dict[str, Any]:
+    # JSON-RPC tools/list shape: camelCase inputSchema only
+    return {
+        "tools": [
+            {
+                "name": t["name"],
+                "description": t["description"],
+                "type": t["type"],
+                "inputSchema": t["inputSchema"],
+            }
+            for t in _tool_list_payload()["tools"]
+        ]
+    }
+
+# Discovery payloads never change at runtime: build (and serialize) them once
+_START_JOB_SCHEMA = _start_job_schema()
+_GET_JOB_SCHEMA   = _get_job_schema()
+_TOOLS_JSON_BYTES  = orjson.dumps(_tool_list_payload())
+_SCHEMA_JSON_BYTES = orjson.dumps(_schema_payload())
+_RPC_TOOLS_RESULT_BYTES = orjson.dumps(_rpc_tools_result())
+
+def _json_bytes(body: bytes, code: int = 200):
+    return Response(body, status=code, mimetype="application/json")
+
 
 # -----------------------------
-# (Optional) FastMCP-style tool defs
+# Tools (shared impls in sora_core; FastMCP registration is opt-in)
 # -----------------------------
-if _FASTMCP_AVAILABLE:
+def _require_key() -> None:
+    if not SORA_API_KEY:
+        raise RuntimeError("Missing SORA_API_KEY or OPENAI_API_KEY")
+
+def start_sora_job(
+    prompt: str,
+    duration: float = 12,
+    aspect_ratio: str = "16:9",
+    resolution: str = "1080p",
+    audio: bool = True,
+    negative_prompt: Optional[str] = None,
+) -> str:
+    # Only model + prompt are sent upstream; the other fields stay for schema compatibility
+    _require_key()
+    return start_job(_http(), prompt, SORA_MODEL_ID)
+
+def get_sora_job(job_id: str) -> Dict[str, Any]:
+    _require_key()
+    return _poll_job(job_id)
+
+_TOOL_DISPATCH: Dict[str, Callable[..., Any]] = {
+    "start_sora_job": start_sora_job,
+    "get_sora_job": get_sora_job,
+}
+
+@lru_cache(maxsize=1)
+def _get_mcp():
+    # Optional dependency (pulls in the MCP SDK + pydantic); HTTP workers never import it
+    from mcp.server.fastmcp import FastMCP
     mcp = FastMCP("Sora MCP")
-
-    @mcp.tool()
-    def start_sora_job(
-        prompt: str,
-        duration: float = 12,
-        aspect_ratio: str = "16:9",
-        resolution: str = "1080p",
-        audio: bool = True,
-        negative_prompt: Optional[str] = None,
-    ) -> Dict[str, Any]:
-        if not SORA_API_KEY:
-            raise RuntimeError("Missing SORA_API_KEY or OPENAI_API_KEY")
-
-        payload = {
-            "model": SORA_MODEL_ID,
-            "prompt": prompt,
-            "duration": duration,
-            "aspect_ratio": aspect_ratio,
-            "resolution": resolution,
-            "audio": audio,
-            "negative_prompt": negative_prompt,
-        }
-        headers = {
-            "Authorization": f"Bearer {SORA_API_KEY}",
-            "Content-Type": "application/json",
-        }
-        openai_client = OpenAI(api_key=SORA_API_KEY)
-        response = openai_client.videos.create(
-            model = "sora-2",
-            prompt = payload["prompt"]
-        )
-
-        video_job_id = response.id
-        return video_job_id
-        
-
-
-    @mcp.tool()
-    def get_sora_job(job_id: str) -> Dict[str, Any]:
-        if not SORA_API_KEY:
-            raise RuntimeError("Missing SORA_API_KEY or OPENAI_API_KEY")
-        headers = {"Authorization": f"Bearer {SORA_API_KEY}"}
-        with httpx.Client(timeout=HTTP_TIMEOUT) as client:
-            r = client.get(f"{SORA_API_BASE}/video/jobs/{job_id}", headers=headers)
-            data = _safe_json(r)
-        assets = (data.get("output") or {}).get("assets") or []
-        video_url = (assets[0] or {}).get("url") if assets else None
-        return {
-            "status": data.get("status"),
-            "progress": data.get("progress"),
-            "video_url": video_url,
-            "thumbnail_url": (data.get("output") or {}).get("thumbnail_url"),
-            "raw": data,
-        }
-else:
-    # Fallback: define same functions directly (no FastMCP installed)
-    def start_sora_job(**kwargs) -> Dict[str, Any]:
-        prompt = kwargs.get("prompt")
-        if not prompt:
-            raise RuntimeError("start_sora_job requires 'prompt'")
-        duration = kwargs.get("duration", 12)
-        aspect_ratio = kwargs.get("aspect_ratio", "16:9")
-        resolution = kwargs.get("resolution", "1080p")
-        audio = kwargs.get("audio", True)
-        negative_prompt = kwargs.get("negative_prompt")
-
-        headers = {
-            "Authorization": f"Bearer {SORA_API_KEY}",
-            "Content-Type": "application/json",
-        }
-        payload = {
-            "model": SORA_MODEL_ID,
-            "prompt": prompt,
-            "duration": duration,
-            "aspect_ratio": aspect_ratio,
-            "resolution": resolution,
-            "audio": audio,
-            "negative_prompt": negative_prompt,
-        }
-        with httpx.Client(timeout=HTTP_TIMEOUT) as client:
-            r = client.post(f"{SORA_API_BASE}/videos", headers=headers, json=payload)
-            return _safe_json(r)
-
-    def get_sora_job(**kwargs) -> Dict[str, Any]:
-        job_id = kwargs.get("job_id")
-        if not job_id:
-            raise RuntimeError("get_sora_job requires 'job_id'")
-        headers = {"Authorization": f"Bearer {SORA_API_KEY}"}
-        with httpx.Client(timeout=HTTP_TIMEOUT) as client:
-            r = client.get(f"{SORA_API_BASE}/video/jobs/{job_id}", headers=headers)
-            data = _safe_json(r)
-        assets = (data.get("output") or {}).get("assets") or []
-        video_url = (assets[0] or {}).get("url") if assets else None
-        return {
-            "status": data.get("status"),
-            "progress": data.get("progress"),
-            "video_url": video_url,
-            "thumbnail_url": (data.get("output") or {}).get("thumbnail_url"),
-            "raw": data,
-        }
+    mcp.tool()(start_sora_job)
+    mcp.tool()(get_sora_job)
+    return mcp
 
 
 # -----------------------------
@@ -210,10 +269,76 @@ def add_cors(resp):
     resp.headers["Access-Control-Allow-Methods"] = "GET, POST, OPTIONS"
     return resp
 
-from uuid import uuid4
+# -----------------------------
+# JSON-RPC (MCP over HTTP) handlers
+# -----------------------------
+def rpc_result(id_, result):
+    return Response(orjson.dumps({"jsonrpc": "2.0", "id": id_, "result": result}),
+                    status=200, content_type="application/json; charset=utf-8")
+
+def rpc_error(id_, code, message, data=None):
+    payload = {"jsonrpc": "2.0", "id": id_, "error": {"code": code, "message": message}}
+    if data is not None:
+        payload["error"]["data"] = data
+    return Response(orjson.dumps(payload), status=200,
+                    content_type="application/json; charset=utf-8")
+
+# Static results are pre-encoded; only the id (and protocolVersion) is spliced in
+_RPC_RESULT_PREFIX = b'{"jsonrpc":"2.0","id":'
+_INITIALIZE_RESULT_TAIL = b"," + orjson.dumps({
+    "serverInfo": {"name": "sora-mcp", "version": "1.0.0"},
+    "capabilities": {
+        "tools": {}  # advertise tools capability
+    }
+})[1:]
+
+def _rpc_result_bytes(id_, result: bytes):
+    return Response(_RPC_RESULT_PREFIX + orjson.dumps(id_) + b',"result":' + result + b"}",
+                    status=200, content_type="application/json; charset=utf-8")
+
+# 1) initialize
+def _handle_initialize(id_, params):
+    proto = params.get("protocolVersion", "2025-06-18")
+    return _rpc_result_bytes(
+        id_, b'{"protocolVersion":' + orjson.dumps(proto) + _INITIALIZE_RESULT_TAIL
+    )
+
+# 1.1) notifications/initialized (notification → no id, no response body)
+def _handle_initialized(id_, params):
+    return ("", 204)
+
+# 2) tools/list  —> MUST return tools with inputSchema
+def _handle_tools_list(id_, params):
+    return _rpc_result_bytes(id_, _RPC_TOOLS_RESULT_BYTES)
+
+# 3) tools/call  —> dispatch to your Python functions and wrap result
+def _handle_tools_call(id_, params):
+    name = params.get("name")
+    arguments = params.get("arguments") or {}
+    if not name:
+        return rpc_error(id_, -32602, "Missing 'name' in tools/call params")
 
-from flask import request, jsonify, make_response
-from uuid import uuid4
+    fn = _TOOL_DISPATCH.get(name) if isinstance(name, str) else None
+    if fn is None:
+        return rpc_error(id_, -32601, f"Unknown tool '{name}'")
+    try:
+        result = fn(**arguments)
+        # MCP JSON-RPC result shape:
+        return rpc_result(id_, {"content": result})
+    except Exception as e:
+        return rpc_error(id_, -32000, "Tool execution failed", {"message": str(e)})
+
+_RPC_HANDLERS = {
+    "initialize": _handle_initialize,
+    "notifications/initialized": _handle_initialized,
+    "tools/list": _handle_tools_list,
+    "tools/call": _handle_tools_call,
+}
+
+# Fire-and-forget notification; matched on raw bytes so it skips JSON parsing.
+# Only trusted on flat bodies (a single "{"), where "method" must be the top-level
+# key; anything nested is parsed and routed via _RPC_HANDLERS as usual.
+_INITIALIZED_NOTIFICATION = re.compile(rb'"method"\s*:\s*"notifications/initialized"')
 
 @app.route("/", methods=["GET", "POST", "OPTIONS"])
 def root_jsonrpc():
@@ -230,22 +355,17 @@ def root_jsonrpc():
             "endpoints": {"tools": "/tools", "run": "/tools/call", "schema": "/.well-known/mcp.json"}
         })
 
-    body = request.get_json(silent=True) or {}
-    print("[MCP] / body:", body)
-
-    # Helpers
-    def rpc_result(id_, result):
-        resp = make_response(jsonify({"jsonrpc": "2.0", "id": id_, "result": result}), 200)
-        resp.headers["Content-Type"] = "application/json; charset=utf-8"
-        return resp
-
-    def rpc_error(id_, code, message, data=None):
-        payload = {"jsonrpc": "2.0", "id": id_, "error": {"code": code, "message": message}}
-        if data is not None:
-            payload["error"]["data"] = data
-        resp = make_response(jsonify(payload), 200)
-        resp.headers["Content-Type"] = "application/json; charset=utf-8"
-        return resp
+    raw = request.get_data(cache=False)
+    if raw.count(b"{") == 1 and _INITIALIZED_NOTIFICATION.search(raw):
+        return ("", 204)
+    try:
+        body = orjson.loads(raw) if raw else {}
+    except orjson.JSONDecodeError:
+        body = {}
+    if not isinstance(body, dict):
+        body = {}
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("/ body: %s", body)
 
     # Not a JSON-RPC request? Show descriptor
     if body.get("jsonrpc") != "2.0" or "method" not in body:
@@ -255,107 +375,40 @@ def root_jsonrpc():
     id_ = body.get("id", str(uuid4()))
     params = body.get("params") or {}
 
-    # 1) initialize
-    if method == "initialize":
-        proto = params.get("protocolVersion", "2025-06-18")
-        return rpc_result(id_, {
-            "protocolVersion": proto,
-            "serverInfo": {"name": "sora-mcp", "version": "1.0.0"},
-            "capabilities": {
-                "tools": {}  # advertise tools capability
-            }
-        })
-
-    # 1.1) notifications/initialized (notification → no id, no response body)
-    if method == "notifications/initialized":
-        return ("", 204)
-
-    # 2) tools/list  —> MUST return tools with inputSchema
-    if method == "tools/list":
-        tools = [
-            {
-                "name": "start_sora_job",
-                "description": "Create a Sora video generation job",
-                "type": "function",
-                "inputSchema": {  # 👈 camelCase, JSON Schema for args
-                    "type": "object",
-                    "properties": {
-                        "prompt": {"type": "string"},
-                        "duration": {"type": "number"},
-                        "aspect_ratio": {"type": "string"},
-                        "resolution": {"type": "string"},
-                        "audio": {"type": "boolean"},
-                        "negative_prompt": {"type": "string"}
-                    },
-                    "required": ["prompt"]
-                }
-            },
-            {
-                "name": "get_sora_job",
-                "description": "Poll a Sora job and return status + asset URLs",
-                "type": "function",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "job_id": {"type": "string"}
-                    },
-                    "required": ["job_id"]
-                }
-            }
-        ]
-        return rpc_result(id_, {"tools": tools})
-
-    # 3) tools/call  —> dispatch to your Python functions and wrap result
-    if method == "tools/call":
-        name = params.get("name")
-        arguments = params.get("arguments") or {}
-        if not name:
-            return rpc_error(id_, -32602, "Missing 'name' in tools/call params")
-
-        try:
-            if name == "start_sora_job":
-                result = start_sora_job(**arguments)
-            elif name == "get_sora_job":
-                result = get_sora_job(**arguments)
-            else:
-                return rpc_error(id_, -32601, f"Unknown tool '{name}'")
-            # MCP JSON-RPC result shape:
-            return rpc_result(id_, {"content": result})
-        except Exception as e:
-            return rpc_error(id_, -32000, "Tool execution failed", {"message": str(e)})
-
-    # Unknown method
-    return rpc_error(id_, -32601, f"Method '{method}' not found")
-
-
+    handler = _RPC_HANDLERS.get(method) if isinstance(method, str) else None
+    if handler is None:
+        return rpc_error(id_, -32601, f"Method '{method}' not found")
+    return handler(id_, params)
 
 
 @app.route("/healthz", methods=["GET"])
 def healthz():
     return _ok({"ok": True, "status": "healthy"})
 
+_PUBLIC_PATHS = frozenset({
+    "/", "/healthz", "/tools", "/mcp/tools", "/schema.json", "/.well-known/mcp.json"
+})
+
+# Accepted Authorization values, built once (bare token or "Bearer <token>")
+_EXPECTED_AUTH = (
+    (ACCESS_TOKEN.encode(), b"Bearer " + ACCESS_TOKEN.encode()) if ACCESS_TOKEN else ()
+)
+
 def _require_auth_for_exec() -> Optional[Any]:
     # Public read-only endpoints:
-    if request.method == "OPTIONS" or request.path in {
-        "/", "/healthz", "/tools", "/mcp/tools", "/schema.json", "/.well-known/mcp.json"
-    }:
+    if request.method == "OPTIONS" or request.path in _PUBLIC_PATHS:
         return None
     # Execution endpoints require token if set:
-    if ACCESS_TOKEN:
-        auth = request.headers.get("Authorization", "")
-        if auth == ACCESS_TOKEN or auth == f"Bearer {ACCESS_TOKEN}":
+    if _EXPECTED_AUTH:
+        raw = request.headers.get("Authorization", "").encode()
+        if any(hmac.compare_digest(raw, e) for e in _EXPECTED_AUTH):
             return None
         return _err("Unauthorized", 401)
     return None
 
 @app.get("/schema.json")
 def schema_json():
-    return _ok({
-        "name": "sora-mcp",
-        "version": "1.0.0",
-        "endpoints": {"tools": "/tools", "run": "/tools/call"},
-        "tools": [t["name"] for t in _tool_list_payload()["tools"]],
-    })
+    return _json_bytes(_SCHEMA_JSON_BYTES)
 
 @app.get("/.well-known/mcp.json")
 def well_known_schema():
@@ -367,7 +420,7 @@ def well_known_schema():
 # -----------------------------
 @app.get("/tools")
 def tools_alias_get():
-    return _ok(_tool_list_payload())
+    return _json_bytes(_TOOLS_JSON_BYTES)
 
 @app.get("/mcp/tools")
 def tools_mcp_get():
@@ -392,12 +445,16 @@ def mcp_run():
     return _run_tool_impl()
 
 def _run_tool_impl():
-    auth = request.headers.get("Authorization", "")
-    print(f"[MCP] {request.method} {request.path} Auth:{auth[:20]}...")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s %s auth=%.20s...", request.method, request.path,
+                     request.headers.get("Authorization", ""))
 
+    raw = request.get_data(cache=False)
     try:
-        body = request.get_json(force=True) or {}
-    except Exception:
+        body = orjson.loads(raw)  # empty body is invalid JSON too, as with get_json(force=True)
+    except orjson.JSONDecodeError:
+        return _err("Invalid JSON body", 400)
+    if not isinstance(body, dict):
         return _err("Invalid JSON body", 400)
 
     name = body.get("name") or body.get("tool")
@@ -406,16 +463,24 @@ def _run_tool_impl():
     if not name:
         return _err("Missing 'name' (tool)", 400)
 
+    fn = _TOOL_DISPATCH.get(name) if isinstance(name, str) else None
+    if fn is None:
+        return _err(f"Unknown tool '{name}'", 404)
+
+    batched = fn is get_sora_job and isinstance(args, list)
+    if batched:
+        if len(args) > POLL_BATCH_MAX:
+            return _err(f"Too many job_ids in batch (max {POLL_BATCH_MAX})", 400)
+        if not all(isinstance(jid, str) and jid for jid in args):
+            return _err("Batched 'arguments' must be a list of non-empty job_id strings", 400)
+
     try:
-        if name == "start_sora_job":
-            # call the decorated function (if FastMCP is installed) or fallback impl
-            result = start_sora_job(**args) if _FASTMCP_AVAILABLE else start_sora_job(**args)
-            return _ok({"ok": True, "result": result})
-        elif name == "get_sora_job":
-            result = get_sora_job(**args) if _FASTMCP_AVAILABLE else get_sora_job(**args)
-            return _ok({"ok": True, "result": result})
+        if batched:
+            # Batched poll: "arguments" is a list of job_ids, polled concurrently
+            result = list(_POLL_POOL.map(lambda jid: get_sora_job(job_id=jid), args))
         else:
-            return _err(f"Unknown tool '{name}'", 404)
+            result = fn(**args)
+        return _ok({"ok": True, "result": result})
 
     except httpx.HTTPError as e:
         return _err(f"Upstream error: {str(e)}", 502)
@@ -424,7 +489,11 @@ def _run_tool_impl():
 
 
 # -----------------------------
-# Local dev entry (optional)
+# Local dev entry (optional; MCP_STDIO=1 for stdio)
 # -----------------------------
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=int(os.getenv("PORT", 8080)))
+    if MCP_STDIO:
+        _get_mcp().run()
+    else:
+        prewarm_upstream()
+        app.run(host="0.0.0.0", port=int(os.getenv("PORT", 8080)))
@@ -0,0 +1,80 @@
+# sora_core.py
+"""
+Upstream Sora calls shared by the MCP server entry points.
+- Every helper takes the caller's pooled httpx.Client (base_url + auth preset).
+- No Flask / MCP imports here; transports wrap these functions.
+"""
+
+import time
+from typing import Optional, Dict, Any, Tuple
+import httpx
+import orjson
+
+_EMPTY: Dict[str, Any] = {}  # shared read-only default; never mutate
+
+# Same retry policy the OpenAI SDK applied to videos.create
+_MAX_RETRIES = 2
+_RETRY_STATUSES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+
+def _safe_json(resp: httpx.Response) -> Dict[str, Any]:
+    # orjson parses the raw body bytes directly (no intermediate str decode)
+    try:
+        data = orjson.loads(resp.content)
+    except orjson.JSONDecodeError:
+        return {"status_code": resp.status_code, "text": resp.text}
+    if not isinstance(data, dict):
+        return {"status_code": resp.status_code, "data": data}
+    return data
+
+def summarize_job(data: Dict[str, Any]) -> Dict[str, Any]:
+    output = data.get("output") or _EMPTY
+    assets = output.get("assets") or ()
+    video_url = (assets[0] or _EMPTY).get("url") if assets else None
+    return {
+        "status": data.get("status"),
+        "progress": data.get("progress"),
+        "video_url": video_url,
+        "thumbnail_url": output.get("thumbnail_url"),
+        "raw": data,
+    }
+
+
+def _retry_delay(resp: Optional[httpx.Response], attempt: int) -> float:
+    retry_after = resp.headers.get("Retry-After") if resp is not None else None
+    try:
+        if retry_after is not None and 0 <= float(retry_after) <= 60:
+            return float(retry_after)
+    except ValueError:
+        pass
+    return min(0.5 * 2 ** attempt, 8.0)
+
+def start_job(client: httpx.Client, prompt: str, model: str = "sora-2") -> str:
+    # Same request the OpenAI SDK's videos.create(model=, prompt=) sends,
+    # retried on connection errors, 408/409/429 and 5xx with backoff.
+    if not prompt:
+        raise RuntimeError("start_sora_job requires 'prompt'")
+    for attempt in range(_MAX_RETRIES + 1):
+        try:
+            r = client.post("/videos", json={"model": model, "prompt": prompt})
+        except httpx.TransportError:
+            if attempt == _MAX_RETRIES:
+                raise
+            time.sleep(_retry_delay(None, attempt))
+            continue
+        if r.status_code in _RETRY_STATUSES and attempt < _MAX_RETRIES:
+            time.sleep(_retry_delay(r, attempt))
+            continue
+        if not r.is_success:
+            # Keep the upstream error body in the message, like the SDK's APIStatusError
+            raise httpx.HTTPStatusError(
+                f"Error code: {r.status_code} - {_safe_json(r)}", request=r.request, response=r
+            )
+        return _safe_json(r).get("id")
+
+def get_job(client: httpx.Client, job_id: str) -> Tuple[Dict[str, Any], bool]:
+    # Returns (summary, upstream 2xx?) so callers only cache real job states
+    if not job_id:
+        raise RuntimeError("get_sora_job requires 'job_id'")
+    r = client.get(f"/video/jobs/{job_id}")
+    return summarize_job(_safe_json(r)), r.is_success